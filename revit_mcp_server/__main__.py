@@ -0,0 +1,37 @@
+"""Command line entry point: ``python -m revit_mcp_server <command>``.
+
+Commands:
+    serve   Run the production server (see launcher.py)
+    replay  Play a traffic capture against a running server (see replay.py)
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import launcher  # noqa: E402
+import replay  # noqa: E402
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m revit_mcp_server")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    serve_parser = commands.add_parser("serve", help="Run the production server")
+    launcher.add_arguments(serve_parser)
+    serve_parser.set_defaults(handler=launcher.serve)
+
+    replay_parser = commands.add_parser("replay", help="Replay captured traffic against a running server")
+    replay.add_arguments(replay_parser)
+    replay_parser.set_defaults(handler=replay.run)
+
+    args = parser.parse_args(argv)
+    return args.handler(args) or 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
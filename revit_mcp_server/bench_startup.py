@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""Cold-start benchmark and budget check for the Revit MCP server.
+
+Measures, in fresh interpreters:
+  1. Total ``-X importtime`` of ``import main``
+  2. Wall time from starting ``uvicorn main:app`` to the first ``tools/list``
+     response over HTTP (the server is polled until it answers)
+
+Exits with status 1 when either median exceeds its budget, so it can run as a
+regression check in CI:
+
+    python bench_startup.py --runs 5 --import-budget-ms 1500 --first-list-budget-ms 2500
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+from typing import List
+
+SERVER_DIR = Path(__file__).resolve().parent
+
+STARTUP_TIMEOUT = 30.0  # seconds
+POLL_INTERVAL = 0.01  # seconds between connection attempts
+
+TOOLS_LIST = json.dumps({"jsonrpc": "2.0", "id": 1, "method": "tools/list", "params": {}}).encode("utf8")
+
+
+def _env() -> dict:
+    env = dict(os.environ)
+    env.setdefault("USE_MOCK", "true")
+    return env
+
+
+def measure_import_ms() -> float:
+    """Sum of the self times reported by ``-X importtime`` for ``import main``."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=SERVER_DIR, env=_env(), capture_output=True, text=True, check=True,
+    )
+    total_us = 0
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:"):].split("|")
+        try:
+            total_us += int(fields[0])
+        except ValueError:
+            continue  # header line
+    return total_us / 1000.0
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _tools_list(url: str) -> str:
+    request = urllib.request.Request(
+        url,
+        data=TOOLS_LIST,
+        headers={"Content-Type": "application/json", "Accept": "application/json, text/event-stream"},
+    )
+    with urllib.request.urlopen(request, timeout=STARTUP_TIMEOUT) as response:
+        return response.read().decode("utf8")
+
+
+def measure_first_list_ms() -> float:
+    """Wall time from launching a server process to its first tools/list response over HTTP."""
+    port = _free_port()
+    url = f"http://127.0.0.1:{port}/mcp"
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=SERVER_DIR, env=_env(), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        while True:
+            if proc.poll() is not None:
+                raise RuntimeError(f"Server exited with status {proc.returncode} before answering")
+            try:
+                body = _tools_list(url)
+                break
+            except urllib.error.HTTPError:
+                raise
+            except OSError:
+                # Not listening yet
+                if time.perf_counter() - start > STARTUP_TIMEOUT:
+                    raise RuntimeError(f"No tools/list response within {STARTUP_TIMEOUT:.0f}s")
+                time.sleep(POLL_INTERVAL)
+        elapsed_ms = (time.perf_counter() - start) * 1000.0
+    finally:
+        proc.terminate()
+        proc.wait(timeout=10)
+    if '"tools"' not in body:
+        raise RuntimeError(f"Unexpected tools/list response: {body[:200]}")
+    return elapsed_ms
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Cold-start benchmark for the Revit MCP server")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--import-budget-ms", type=float, default=float(os.getenv("IMPORT_BUDGET_MS", 1500)))
+    parser.add_argument("--first-list-budget-ms", type=float, default=float(os.getenv("FIRST_LIST_BUDGET_MS", 2500)))
+    args = parser.parse_args()
+
+    import_times: List[float] = [measure_import_ms() for _ in range(args.runs)]
+    first_list_times: List[float] = [measure_first_list_ms() for _ in range(args.runs)]
+
+    import_ms = statistics.median(import_times)
+    first_list_ms = statistics.median(first_list_times)
+
+    print(f"import main (importtime):  {import_ms:8.1f} ms  (budget {args.import_budget_ms:.0f} ms)")
+    print(f"first tools/list (HTTP):   {first_list_ms:8.1f} ms  (budget {args.first_list_budget_ms:.0f} ms)")
+
+    failed = False
+    if import_ms > args.import_budget_ms:
+        print("✗ Import time exceeds budget")
+        failed = True
+    if first_list_ms > args.first_list_budget_ms:
+        print("✗ Time to first tools/list exceeds budget")
+        failed = True
+    if not failed:
+        print("✓ Startup within budget")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
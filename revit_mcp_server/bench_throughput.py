@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""Throughput benchmark for a running Revit MCP server.
+
+Start the server in mock mode, then run this script against it:
+
+    USE_MOCK=true python main.py                                  # dev server
+    USE_MOCK=true python -m revit_mcp_server serve --workers 4    # production launcher
+    python bench_throughput.py --requests 2000 --concurrency 32
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
+
+import requests
+
+from mcp_http import DEFAULT_URL, call_tool
+
+ARGUMENTS = {"x_count": 8, "y_count": 6, "dry_run": True}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default=DEFAULT_URL)
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--tool", default="create-xy-grids")
+    args = parser.parse_args()
+
+    local = threading.local()
+
+    def one(_: int) -> float:
+        if not hasattr(local, "session"):
+            local.session = requests.Session()
+        _, elapsed_ms = call_tool(args.tool, ARGUMENTS, url=args.url, session=local.session)
+        return elapsed_ms
+
+    # Warm up connections and lazy state
+    with ThreadPoolExecutor(args.concurrency) as pool:
+        list(pool.map(one, range(args.concurrency)))
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(args.concurrency) as pool:
+        latencies: List[float] = list(pool.map(one, range(args.requests)))
+    wall = time.perf_counter() - start
+
+    latencies.sort()
+    print(f"Requests:    {args.requests} (concurrency {args.concurrency})")
+    print(f"Throughput:  {args.requests / wall:.1f} req/s")
+    print(f"Latency p50: {statistics.median(latencies):.2f} ms")
+    print(f"Latency p95: {latencies[int(len(latencies) * 0.95) - 1]:.2f} ms")
+    print(f"Latency max: {latencies[-1]:.2f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
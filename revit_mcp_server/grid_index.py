@@ -0,0 +1,273 @@
+"""In-memory index of the grid lattice for spatial queries without Revit.
+
+The X×Y intersection lattice is the cartesian product of two sorted coordinate
+arrays, so it is stored as those two arrays instead of being materialized:
+nearest-intersection and bay-in-rectangle queries are binary searches
+(``np.searchsorted``) and stay sub-millisecond for lattices with millions of
+intersections. Bay cells are only expanded for the slice a query returns.
+
+The index follows committed (non dry-run) grid tool results: created grids are
+merged in by name, ``remove_all`` clears it and margin/height changes update
+the range. Grids at the same coordinate (e.g. ``Y-A`` and ``Y-1`` both at
+y=0) are one line of the lattice, so they never produce zero-width bays.
+
+The index lives in one process and there is no Revit snapshot to seed it
+from. Queries are refused until this process has seen a grid creation or
+``remove_all`` (an empty index would look like an empty model), and always
+when the server runs several workers (``REVIT_MCP_WORKERS``, exported by the
+launcher), since each worker only sees the mutations it handled itself.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from grid_results import parse_grids, parse_numbers
+
+logger = logging.getLogger(__name__)
+
+MAX_BAYS = 500  # bays returned per query by default
+WORKERS_ENV = "REVIT_MCP_WORKERS"  # set by launcher.serve()
+
+
+class _Axis:
+    """
+    Grid coordinates and names along one axis.
+
+    ``coords``/``names`` hold every grid, sorted by coordinate. Queries use
+    ``lines``, the distinct coordinates (strictly increasing), with
+    ``line_names`` giving the first grid on each line.
+    """
+
+    def __init__(self) -> None:
+        self.coords = np.empty(0, dtype=np.float64)
+        self.names = np.empty(0, dtype=object)
+        self.lines = self.coords
+        self.line_names = self.names
+
+    def __len__(self) -> int:
+        """Number of distinct grid lines."""
+        return len(self.lines)
+
+    def merge(self, grids: List[Tuple[str, float]]) -> None:
+        """Add or move grids by name, keeping the arrays sorted."""
+        if not grids:
+            return
+        incoming = dict(grids)
+        keep = np.array([name not in incoming for name in self.names], dtype=bool)
+        names = np.concatenate([self.names[keep], np.array(list(incoming), dtype=object)])
+        coords = np.concatenate([self.coords[keep], np.fromiter(incoming.values(), dtype=np.float64)])
+        order = np.argsort(coords, kind="stable")
+        self.names, self.coords = names[order], coords[order]
+        # Coincident grids (to 1e-6 mm) form a single lattice line
+        self.lines, first = np.unique(np.round(self.coords, 6), return_index=True)
+        self.line_names = self.names[first]
+
+    def clear(self) -> None:
+        self.__init__()
+
+    def nearest(self, value: float) -> int:
+        """Index of the line closest to ``value``."""
+        i = int(np.searchsorted(self.lines, value))
+        if i == 0:
+            return 0
+        if i == len(self.lines):
+            return i - 1
+        return i if self.lines[i] - value < value - self.lines[i - 1] else i - 1
+
+    def span(self, lo: float, hi: float) -> Tuple[int, int]:
+        """Indices [first, last] of lines within [lo, hi]."""
+        first = int(np.searchsorted(self.lines, lo, side="left"))
+        last = int(np.searchsorted(self.lines, hi, side="right")) - 1
+        return first, last
+
+    def stats(self) -> Dict[str, Any]:
+        """Spacing statistics along this axis."""
+        stats: Dict[str, Any] = {"count": len(self.coords), "lines": len(self.lines)}
+        if len(self.lines):
+            stats["min"] = float(self.lines[0])
+            stats["max"] = float(self.lines[-1])
+        if len(self.lines) > 1:
+            spacing = np.diff(self.lines)
+            stats["spacing"] = {
+                "min": float(spacing.min()),
+                "max": float(spacing.max()),
+                "mean": round(float(spacing.mean()), 3),
+                "std": round(float(spacing.std()), 3),
+                "unique": np.unique(np.round(spacing, 3))[:20].tolist(),
+            }
+        return stats
+
+
+def _worker_count() -> int:
+    """Worker processes serving the app, as exported by the launcher (1 if unknown)."""
+    try:
+        return int(os.getenv(WORKERS_ENV) or 1)
+    except ValueError:
+        return 1
+
+
+class GridIndex:
+    """Grid lattice built from grid tool results, updated after each mutation."""
+
+    def __init__(self) -> None:
+        self.x = _Axis()
+        self.y = _Axis()
+        self.range: Dict[str, float] = {}
+        self.version = 0
+        # True once this process has seen a grid creation or remove_all
+        self.populated = False
+        self._lock = threading.Lock()
+
+    # Updates ----------------------------------------------------------------
+
+    def update(self, operation: str, data: Dict[str, Any], result: Dict[str, Any]) -> None:
+        """
+        Apply a successful grid operation; dry-runs are ignored.
+
+        Revit has already committed the change, so this never raises: a result
+        the index can't read is logged and skipped.
+        """
+        if data.get("dry_run") or result.get("status") == "preview":
+            return
+        try:
+            self._apply(operation, data, result)
+        except Exception:
+            logger.exception("Grid index update failed for %s", operation)
+
+    def _apply(self, operation: str, data: Dict[str, Any], result: Dict[str, Any]) -> None:
+        rng = result.get("range") if isinstance(result.get("range"), dict) else None
+        with self._lock:
+            if operation == "remove_all":
+                self.x.clear()
+                self.y.clear()
+                self.range = {}
+                self.populated = True
+            elif operation in ("create_x", "create_y", "create_xy"):
+                self.x.merge(parse_grids(result, "x"))
+                self.y.merge(parse_grids(result, "y"))
+                if rng:
+                    self.range = parse_numbers(rng)
+                self.populated = True
+            elif operation == "set_margins":
+                self._apply_margins(data, rng)
+            elif operation == "set_heights":
+                self.range.update(parse_numbers({
+                    "z_min": data.get("bottom_height"),
+                    "z_max": data.get("top_height"),
+                }))
+            else:
+                return
+            self.version += 1
+
+    def _apply_margins(self, data: Dict[str, Any], rng: Optional[Dict[str, Any]]) -> None:
+        if rng:
+            self.range.update(parse_numbers(rng))
+            return
+        margins = parse_numbers({key: data.get(key, 0) for key in ("left_margin", "right_margin", "top_margin", "bottom_margin")})
+        if len(self.x):
+            self.range["x_min"] = float(self.x.coords[0]) - margins.get("left_margin", 0.0)
+            self.range["x_max"] = float(self.x.coords[-1]) + margins.get("right_margin", 0.0)
+        if len(self.y):
+            self.range["y_min"] = float(self.y.coords[0]) - margins.get("bottom_margin", 0.0)
+            self.range["y_max"] = float(self.y.coords[-1]) + margins.get("top_margin", 0.0)
+
+    # Queries ----------------------------------------------------------------
+
+    def nearest(self, x: float, y: float) -> Dict[str, Any]:
+        """Nearest grid intersection to a point."""
+        if not len(self.x) or not len(self.y):
+            return {"ok": False, "status": "error", "message": "Index needs both X and Y grids"}
+        i, j = self.x.nearest(x), self.y.nearest(y)
+        px, py = float(self.x.lines[i]), float(self.y.lines[j])
+        return {
+            "ok": True,
+            "intersection": {"x_grid": self.x.line_names[i], "y_grid": self.y.line_names[j], "x": px, "y": py},
+            "distance": round(float(np.hypot(px - x, py - y)), 3),
+        }
+
+    def bays(self, x_min: float, x_max: float, y_min: float, y_max: float, limit: int = MAX_BAYS) -> Dict[str, Any]:
+        """Bay cells that lie completely inside a rectangle."""
+        i0, i1 = self.x.span(x_min, x_max)
+        j0, j1 = self.y.span(y_min, y_max)
+        nx, ny = max(0, i1 - i0), max(0, j1 - j0)
+        total = nx * ny
+
+        bays: List[Dict[str, Any]] = []
+        if total:
+            # Expand only the cells that will be returned
+            rows = min(ny, -(-limit // nx))
+            ii, jj = np.meshgrid(np.arange(i0, i1), np.arange(j0, j0 + rows))
+            ii, jj = ii.ravel()[:limit], jj.ravel()[:limit]
+            left, right = self.x.lines[ii], self.x.lines[ii + 1]
+            bottom, top = self.y.lines[jj], self.y.lines[jj + 1]
+            areas = (right - left) * (top - bottom)
+            for k in range(len(ii)):
+                bays.append({
+                    "x_grids": [self.x.line_names[ii[k]], self.x.line_names[ii[k] + 1]],
+                    "y_grids": [self.y.line_names[jj[k]], self.y.line_names[jj[k] + 1]],
+                    "bounds": [float(left[k]), float(bottom[k]), float(right[k]), float(top[k])],
+                    "area": float(areas[k]),
+                })
+
+        return {"ok": True, "count": total, "returned": len(bays), "truncated": total > len(bays), "bays": bays}
+
+    def stats(self) -> Dict[str, Any]:
+        """Spacing statistics and lattice size."""
+        nx, ny = len(self.x), len(self.y)
+        return {
+            "ok": True,
+            "version": self.version,
+            "worker_pid": os.getpid(),
+            "x": self.x.stats(),
+            "y": self.y.stats(),
+            "intersections": nx * ny,
+            "bays": max(0, nx - 1) * max(0, ny - 1),
+            "range": dict(self.range),
+        }
+
+    def query(self, kind: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Dispatch a query by name ('nearest', 'bays' or 'stats')."""
+        workers = _worker_count()
+        if workers > 1:
+            return {
+                "ok": False,
+                "status": "error",
+                "message": (
+                    f"The grid index is not available with {workers} server workers: each worker only "
+                    "sees the grid changes it handled itself, so answers could describe a stale model. "
+                    "Serve with --workers 1 to use query-grid-index."
+                ),
+            }
+        with self._lock:
+            if not self.populated:
+                return {
+                    "ok": False,
+                    "status": "error",
+                    "message": (
+                        "The grid index has not seen any grid being created or removed since the server "
+                        "started, so it cannot answer for the current model. The index is "
+                        "empty after a restart. Re-run the grid creation (not a dry-run), then query again."
+                    ),
+                }
+            if kind == "nearest":
+                return self.nearest(float(params.get("x", 0)), float(params.get("y", 0)))
+            if kind == "bays":
+                # Missing rectangle sides are unbounded
+                bounds = [params.get(key) for key in ("x_min", "x_max", "y_min", "y_max")]
+                x_min, x_max, y_min, y_max = (
+                    (-np.inf if i % 2 == 0 else np.inf) if value is None else float(value)
+                    for i, value in enumerate(bounds)
+                )
+                return self.bays(x_min, x_max, y_min, y_max, int(params.get("limit", MAX_BAYS)))
+            if kind == "stats":
+                return self.stats()
+        return {"ok": False, "status": "error", "message": f"Unknown query: {kind}"}
+
+
+GRID_INDEX = GridIndex()
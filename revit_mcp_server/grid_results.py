@@ -0,0 +1,43 @@
+"""Parsing helpers for grid tool results returned by pyRevit (or the mock).
+
+Grid lists come under ``created_x``/``created_y`` (create-xy-grids), ``grids``
+(committed single-axis creation) or ``items`` (dry-run previews). Values are
+read defensively: an item without a usable coordinate is skipped.
+"""
+
+from __future__ import annotations
+
+import math
+from typing import Any, Dict, List, Optional, Tuple
+
+Grid = Tuple[str, float]
+
+
+def parse_number(value: Any) -> Optional[float]:
+    """Finite float from a pyRevit value, or None if it can't be parsed."""
+    if isinstance(value, bool):
+        return None
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    return number if math.isfinite(number) else None
+
+
+def parse_numbers(values: Dict[str, Any]) -> Dict[str, float]:
+    """The parsable numeric entries of a mapping such as ``range``."""
+    parsed = {key: parse_number(value) for key, value in values.items()}
+    return {key: value for key, value in parsed.items() if value is not None}
+
+
+def parse_grids(result: Dict[str, Any], axis: str) -> List[Grid]:
+    """(name, coordinate) pairs along ``axis`` in a grid tool result, in result order."""
+    items = result.get(f"created_{axis}")
+    if items is None:
+        items = result.get("grids") or result.get("items") or []
+    grids: List[Grid] = []
+    for item in items if isinstance(items, list) else []:
+        coord = parse_number(item.get(axis)) if isinstance(item, dict) else None
+        if coord is not None:
+            grids.append((str(item.get("name", item.get("id", ""))), coord))
+    return grids
@@ -0,0 +1,221 @@
+"""Production launcher for the Revit MCP server.
+
+``main.py`` only ships a single-worker dev reloader. The launcher runs the same
+app with several workers, uvloop/httptools when installed, and tuned
+keep-alive and backlog settings.
+
+On POSIX the app is imported once in the parent (widget assets and tool
+catalog included) and workers are forked from it, so they share those memory
+pages copy-on-write. Platforms without ``fork`` (Windows) fall back to
+uvicorn's own multi-process supervisor, where each worker imports the app.
+"""
+
+from __future__ import annotations
+
+import gc
+import importlib.util
+import logging
+import logging.config
+import os
+import signal
+import sys
+import time
+from collections import deque
+from pathlib import Path
+from typing import Any, Deque, Dict
+
+SERVER_DIR = Path(__file__).resolve().parent
+
+# Revit calls time out after 30 s (see RevitAPIClient.timeout), so give an
+# in-flight call that long to finish before workers are torn down.
+DEFAULT_GRACEFUL_TIMEOUT = 35
+
+# Crash-loop guard: give up when this many workers die within CRASH_WINDOW
+# seconds of being started (e.g. lifespan startup keeps failing).
+CRASH_WINDOW = 10.0
+MAX_CRASHES = 5
+
+# Configured by _configure_logging() and again by each uvicorn Config
+logger = logging.getLogger("uvicorn.error")
+
+
+def _pick_implementations() -> Dict[str, str]:
+    """Use uvloop and httptools when they are installed."""
+    has_uvloop = importlib.util.find_spec("uvloop") is not None and sys.platform != "win32"
+    has_httptools = importlib.util.find_spec("httptools") is not None
+    return {
+        "loop": "uvloop" if has_uvloop else "asyncio",
+        "http": "httptools" if has_httptools else "h11",
+    }
+
+
+def _configure_logging(args: Any) -> None:
+    """Apply uvicorn's logging setup before any Config exists, so launcher messages show."""
+    import uvicorn.config
+
+    logging.config.dictConfig(uvicorn.config.LOGGING_CONFIG)
+    logger.setLevel(uvicorn.config.LOG_LEVELS[args.log_level.lower()])
+
+
+def _preload() -> Any:
+    """Import the app and build everything workers can share before forking."""
+    if str(SERVER_DIR) not in sys.path:
+        sys.path.insert(0, str(SERVER_DIR))
+
+    import main
+
+    main.warm_up()
+    return main.app
+
+
+def _config_kwargs(args: Any) -> Dict[str, Any]:
+    """uvicorn settings shared by every launch mode."""
+    return {
+        "host": args.host,
+        "port": args.port,
+        "backlog": args.backlog,
+        "timeout_keep_alive": args.keep_alive,
+        "timeout_graceful_shutdown": args.graceful_timeout,
+        "limit_concurrency": args.limit_concurrency,
+        "log_level": args.log_level,
+        "access_log": args.access_log,
+        **_pick_implementations(),
+    }
+
+
+def _run_spawned(args: Any) -> None:
+    """Multi-worker fallback for platforms without fork."""
+    import uvicorn
+
+    uvicorn.run("main:app", app_dir=str(SERVER_DIR), workers=args.workers, **_config_kwargs(args))
+
+
+def _run_forked(args: Any) -> int:
+    """Preload the app, bind once and fork workers that share the socket."""
+    import uvicorn
+
+    app = _preload()
+    config = uvicorn.Config(app, **_config_kwargs(args))
+    sock = config.bind_socket()
+
+    # Move preloaded objects out of the collector's reach so that GC passes in
+    # the workers don't touch (and un-share) their pages.
+    gc.collect()
+    gc.freeze()
+
+    def spawn() -> int:
+        pid = os.fork()
+        if pid == 0:
+            # The child must never return into the parent's supervision loop
+            code = 3
+            try:
+                signal.signal(signal.SIGINT, signal.SIG_DFL)
+                signal.signal(signal.SIGTERM, signal.SIG_DFL)
+                server = uvicorn.Server(config)
+                server.run(sockets=[sock])
+                # A server that never started (failed lifespan startup) exits non-zero
+                code = 0 if server.started else 3
+            except BaseException:
+                logger.exception("Worker %d crashed", os.getpid())
+                code = 1
+            finally:
+                os._exit(code)
+        return pid
+
+    # pid -> start time
+    workers: Dict[int, float] = {}
+    for _ in range(args.workers):
+        workers[spawn()] = time.monotonic()
+    crashes: Deque[float] = deque()
+    stopping = False
+    exit_code = 0
+
+    def shutdown(signum: int, frame: Any) -> None:
+        nonlocal stopping
+        stopping = True
+        for pid in workers:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGINT, shutdown)
+    signal.signal(signal.SIGTERM, shutdown)
+
+    # Reap workers; restart any that die unexpectedly
+    while workers:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        except InterruptedError:
+            continue
+        if pid not in workers:
+            continue
+        started_at = workers.pop(pid)
+        code = os.waitstatus_to_exitcode(status)
+        if stopping:
+            logger.info("Worker %d exited with status %d", pid, code)
+            continue
+
+        logger.warning("Worker %d exited unexpectedly with status %d", pid, code)
+        now = time.monotonic()
+        if now - started_at < CRASH_WINDOW:
+            crashes.append(now)
+        while crashes and now - crashes[0] > CRASH_WINDOW:
+            crashes.popleft()
+        if len(crashes) >= MAX_CRASHES:
+            logger.error(
+                "%d workers died within %.0fs of starting; shutting down", len(crashes), CRASH_WINDOW
+            )
+            exit_code = 1
+            shutdown(signal.SIGTERM, None)
+            continue
+
+        time.sleep(0.5)
+        workers[spawn()] = time.monotonic()
+
+    sock.close()
+    return exit_code
+
+
+def serve(args: Any) -> int:
+    """Run the server with the given CLI options; returns the process exit code."""
+    _configure_logging(args)
+    # Per-process state (e.g. the grid index) checks this; workers inherit it
+    os.environ["REVIT_MCP_WORKERS"] = str(max(1, args.workers))
+    impl = _pick_implementations()
+    logger.info(
+        "Serving on http://%s:%d with %d worker(s) (loop=%s, http=%s)",
+        args.host, args.port, args.workers, impl["loop"], impl["http"],
+    )
+
+    if args.workers <= 1:
+        import uvicorn
+
+        server = uvicorn.Server(uvicorn.Config(_preload(), **_config_kwargs(args)))
+        server.run()
+        return 0 if server.started else 3
+    if hasattr(os, "fork"):
+        return _run_forked(args)
+    _run_spawned(args)
+    return 0
+
+
+def add_arguments(parser: Any) -> None:
+    """Register ``serve`` options on an argparse parser."""
+    parser.add_argument("--host", default=os.getenv("HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", "8000")))
+    parser.add_argument(
+        "--workers", type=int, default=int(os.getenv("WEB_CONCURRENCY", os.cpu_count() or 1)),
+        help="Number of worker processes (default: WEB_CONCURRENCY or CPU count)",
+    )
+    parser.add_argument("--backlog", type=int, default=2048, help="Listen socket backlog")
+    parser.add_argument("--keep-alive", type=int, default=75, help="Keep-alive timeout in seconds")
+    parser.add_argument(
+        "--graceful-timeout", type=int, default=DEFAULT_GRACEFUL_TIMEOUT,
+        help="Seconds to let in-flight Revit calls finish on shutdown",
+    )
+    parser.add_argument("--limit-concurrency", type=int, default=None, help="Max concurrent connections per worker")
+    parser.add_argument("--log-level", default="info")
+    parser.add_argument("--access-log", action="store_true", help="Enable per-request access logging")
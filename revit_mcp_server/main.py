@@ -10,9 +10,11 @@ from __future__ import annotations
 from dataclasses import dataclass
 from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Literal, Optional, Tuple
 from copy import deepcopy
+import logging
 import os
+import time
 
 import mcp.types as types
 from mcp.server.fastmcp import FastMCP
@@ -20,8 +22,13 @@ from pydantic import BaseModel, ConfigDict, Field, ValidationError
 
 # Import Revit API client
 from revit_client import get_revit_client, is_revit_available
+from profiling import PROFILER, admin_routes, arm_from_env
+from traffic import RECORDER, REPLAY
+import svg_preview
 
 
+logger = logging.getLogger(__name__)
+
 MIME_TYPE = "text/html+skybridge"
 ASSETS_DIR = Path(__file__).resolve().parent.parent / "assets"
 
@@ -33,11 +40,25 @@ class RevitWidget:
     template_uri: str
     invoking: str
     invoked: str
-    html: str
+    component_name: str
     response_text: str
 
+    @property
+    def html(self) -> Optional[str]:
+        """Widget markup, read from disk on first use; None if the asset is missing."""
+        return _widget_html(self.component_name)
+
 
 @lru_cache(maxsize=None)
+def _widget_html(component_name: str) -> Optional[str]:
+    """Cached widget markup; a missing asset is logged once and cached as None."""
+    try:
+        return _load_widget_html(component_name)
+    except FileNotFoundError as exc:
+        logger.warning("%s", exc)
+        return None
+
+
 def _load_widget_html(component_name: str) -> str:
     """Load widget HTML from assets directory."""
     html_path = ASSETS_DIR / f"{component_name}.html"
@@ -60,7 +81,7 @@ WIDGET = RevitWidget(
     template_uri="ui://widget/revit-grid.html",
     invoking="Generating grid layout",
     invoked="Grid layout ready",
-    html=_load_widget_html("revit-grid"),
+    component_name="revit-grid",
     response_text="Grid visualization ready",
 )
 
@@ -81,6 +102,7 @@ class GridYInput(BaseModel):
     prefix: str = Field("G-", description="Prefix for grid labels")
     start: int = Field(1, description="Starting number/letter for labels")
     dry_run: bool = Field(False, description="Preview mode without creating grids")
+    output: Literal["widget", "svg"] = Field("widget", description="Result format: 'widget' (interactive) or 'svg' (static preview for hosts without widget support)")
 
     model_config = ConfigDict(populate_by_name=True, extra="allow")
 
@@ -100,6 +122,7 @@ class GridXInput(BaseModel):
     prefix: str = Field("G-", description="Prefix for grid labels")
     start: int = Field(1, description="Starting number/letter for labels")
     dry_run: bool = Field(False, description="Preview mode without creating grids")
+    output: Literal["widget", "svg"] = Field("widget", description="Result format: 'widget' (interactive) or 'svg' (static preview for hosts without widget support)")
 
     model_config = ConfigDict(populate_by_name=True, extra="allow")
 
@@ -109,6 +132,7 @@ class GridXYInput(BaseModel):
     z: float = Field(0, description="Z elevation in mm")
     dry_run: bool = Field(False, description="Preview mode")
     margin: int = Field(3000, description="Margin for grid extents in mm")
+    output: Literal["widget", "svg"] = Field("widget", description="Result format: 'widget' (interactive) or 'svg' (static preview for hosts without widget support)")
 
     # X-axis configuration
     x_mode: str = Field("uniform", description="X-axis mode: 'uniform' or 'segments'")
@@ -162,6 +186,20 @@ class RemoveAllGridsInput(BaseModel):
     model_config = ConfigDict(populate_by_name=True, extra="allow")
 
 
+class GridIndexQueryInput(BaseModel):
+    """Schema for spatial queries on the grid intersection index."""
+    query: Literal["nearest", "bays", "stats"] = Field("stats", description="Query: 'nearest', 'bays' or 'stats'")
+    x: float = Field(0, description="Point X in mm (nearest)")
+    y: float = Field(0, description="Point Y in mm (nearest)")
+    x_min: Optional[float] = Field(None, description="Rectangle minimum X in mm (bays); unbounded if omitted")
+    x_max: Optional[float] = Field(None, description="Rectangle maximum X in mm (bays); unbounded if omitted")
+    y_min: Optional[float] = Field(None, description="Rectangle minimum Y in mm (bays); unbounded if omitted")
+    y_max: Optional[float] = Field(None, description="Rectangle maximum Y in mm (bays); unbounded if omitted")
+    limit: int = Field(500, description="Maximum number of bays to return")
+
+    model_config = ConfigDict(populate_by_name=True, extra="allow")
+
+
 # Initialize FastMCP server
 mcp = FastMCP(
     name="revit-grid-python",
@@ -193,6 +231,54 @@ def _embedded_widget_resource(widget: RevitWidget) -> types.EmbeddedResource:
     )
 
 
+@lru_cache(maxsize=None)
+def _widget_result_meta() -> Dict[str, Any]:
+    """Serialized widget metadata attached to tool results (widget must be available)."""
+    widget_resource = _embedded_widget_resource(WIDGET)
+    return {
+        "openai.com/widget": widget_resource.model_dump(mode="json"),
+        "openai/outputTemplate": WIDGET.template_uri,
+        "openai/toolInvocation/invoking": WIDGET.invoking,
+        "openai/toolInvocation/invoked": WIDGET.invoked,
+        "openai/widgetAccessible": True,
+        "openai/resultCanProduceWidget": True,
+    }
+
+
+def _embedded_svg_preview(result_data: Dict[str, Any], data: Dict[str, Any]) -> Optional[types.EmbeddedResource]:
+    """
+    Render the grid layout server-side as an embedded SVG (cached by payload hash).
+
+    Returns None when there is nothing to draw or rendering fails, so the caller
+    falls back to the widget; the Revit operation has already run by then.
+    """
+    # Requested extents fill in the axis a single-direction result doesn't cover
+    extents = {key: data[key] for key in ("x_min", "x_max", "y_min", "y_max") if key in data}
+    try:
+        digest, svg = svg_preview.render_cached(result_data, extents)
+    except Exception:
+        logger.exception("SVG preview rendering failed")
+        return None
+    if svg is None:
+        return None
+    return types.EmbeddedResource(
+        type="resource",
+        resource=types.TextResourceContents(
+            uri=f"ui://preview/revit-grid-{digest}.svg",
+            mimeType=svg_preview.MIME_TYPE,
+            text=svg,
+        ),
+    )
+
+
+@lru_cache(maxsize=None)
+def _grid_index() -> Any:
+    """The grid intersection index; NumPy is imported on first use."""
+    from grid_index import GRID_INDEX
+
+    return GRID_INDEX
+
+
 def _resource_description(widget: RevitWidget) -> str:
     """Generate resource description."""
     return f"{widget.title} widget markup"
@@ -202,7 +288,34 @@ def _resource_description(widget: RevitWidget) -> str:
 REVIT_SERVER_URL = os.getenv("REVIT_SERVER_URL", "http://127.0.0.1:48884")
 USE_MOCK = os.getenv("USE_MOCK", "false").lower() == "true"
 
-def get_revit_response(operation: str, data: Dict[str, Any]) -> Dict[str, Any]:
+def get_revit_response(
+    operation: str, data: Dict[str, Any], local: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """
+    Get response for an operation, capturing or replaying traffic when enabled.
+
+    Args:
+        operation: Operation type ("create_y", "create_x", "create_xy", etc.)
+        data: Request data
+        local: Tool arguments handled by this server (e.g. ``output``). They are
+            not sent to Revit but are captured, so that replay sends them too.
+
+    Returns:
+        Response dictionary
+    """
+    if REPLAY.active:
+        return REPLAY.response(operation, data)
+    if not RECORDER.active:
+        return _revit_response(operation, data)
+
+    started_at = time.monotonic()
+    start = time.perf_counter()
+    response = _revit_response(operation, data)
+    RECORDER.record(operation, {**data, **(local or {})}, response, started_at, (time.perf_counter() - start) * 1000.0)
+    return response
+
+
+def _revit_response(operation: str, data: Dict[str, Any]) -> Dict[str, Any]:
     """
     Get response from Revit server or use mock if unavailable.
 
@@ -295,11 +408,10 @@ def _mock_response(operation: str, data: Dict[str, Any]) -> Dict[str, Any]:
     return {"ok": True, "message": "Mock response"}
 
 
-# MCP Protocol handlers
-@mcp._mcp_server.list_tools()
-async def _list_tools() -> List[types.Tool]:
-    """List all available Revit grid tools."""
-    tools = [
+@lru_cache(maxsize=None)
+def _tool_catalog() -> Tuple[types.Tool, ...]:
+    """Build the tool list once; JSON schemas are costly to regenerate per request."""
+    return (
         types.Tool(
             name="create-y-grids",
             title="Create Y-Axis Grids",
@@ -360,6 +472,20 @@ async def _list_tools() -> List[types.Tool]:
                 "readOnlyHint": False,
             },
         ),
+        types.Tool(
+            name="query-grid-index",
+            title="Query Grid Intersections",
+            description=(
+                "Nearest grid intersection to a point, bay cells inside a rectangle, or spacing "
+                "statistics, answered from the server's index of created grids without calling Revit"
+            ),
+            inputSchema=GridIndexQueryInput.model_json_schema(),
+            annotations={
+                "destructiveHint": False,
+                "openWorldHint": False,
+                "readOnlyHint": True,
+            },
+        ),
         types.Tool(
             name="remove-all-grids",
             title="Remove All Grids",
@@ -372,8 +498,14 @@ async def _list_tools() -> List[types.Tool]:
                 "readOnlyHint": False,
             },
         ),
-    ]
-    return tools
+    )
+
+
+# MCP Protocol handlers
+@mcp._mcp_server.list_tools()
+async def _list_tools() -> List[types.Tool]:
+    """List all available Revit grid tools."""
+    return list(_tool_catalog())
 
 
 @mcp._mcp_server.list_resources()
@@ -418,11 +550,20 @@ async def _handle_read_resource(req: types.ReadResourceRequest) -> types.ServerR
             )
         )
 
+    html = WIDGET.html
+    if html is None:
+        return types.ServerResult(
+            types.ReadResourceResult(
+                contents=[],
+                _meta={"error": f"Widget assets for {WIDGET.template_uri} have not been built"},
+            )
+        )
+
     contents = [
         types.TextResourceContents(
             uri=WIDGET.template_uri,
             mimeType=MIME_TYPE,
-            text=WIDGET.html,
+            text=html,
             _meta=_tool_meta(WIDGET),
         )
     ]
@@ -431,30 +572,50 @@ async def _handle_read_resource(req: types.ReadResourceRequest) -> types.ServerR
 
 
 async def _call_tool_request(req: types.CallToolRequest) -> types.ServerResult:
-    """Handle tool call requests."""
+    """Handle tool call requests, under the profiler when it is armed."""
+    if not PROFILER.active:
+        return await _dispatch_tool_call(req)
+    return await PROFILER.profile_call(req.params.name, _dispatch_tool_call, req)
+
+
+async def _dispatch_tool_call(req: types.CallToolRequest) -> types.ServerResult:
+    """Route a tool call to its Revit operation and build the result."""
     tool_name = req.params.name
     arguments = req.params.arguments or {}
 
+    # Parameters handled by this server and not forwarded to Revit
+    local_fields = {"output"}
+    local: Dict[str, Any] = {}
+
     # Route to appropriate handler
     try:
-        if tool_name == "create-y-grids":
+        if tool_name == "query-grid-index":
+            query = GridIndexQueryInput.model_validate(arguments)
+            return _grid_index_result(query)
+        elif tool_name == "create-y-grids":
+            operation = "create_y"
             payload = GridYInput.model_validate(arguments)
-            result_data = get_revit_response("create_y", payload.model_dump())
+            data = payload.model_dump(exclude=local_fields)
+            local = payload.model_dump(include=local_fields)
         elif tool_name == "create-x-grids":
+            operation = "create_x"
             payload = GridXInput.model_validate(arguments)
-            result_data = get_revit_response("create_x", payload.model_dump())
+            data = payload.model_dump(exclude=local_fields)
+            local = payload.model_dump(include=local_fields)
         elif tool_name == "create-xy-grids":
+            operation = "create_xy"
             payload = GridXYInput.model_validate(arguments)
-            result_data = get_revit_response("create_xy", payload.model_dump())
+            data = payload.model_dump(exclude=local_fields)
+            local = payload.model_dump(include=local_fields)
         elif tool_name == "set-grid-heights":
-            payload = GridHeightsInput.model_validate(arguments)
-            result_data = get_revit_response("set_heights", payload.model_dump())
+            operation = "set_heights"
+            data = GridHeightsInput.model_validate(arguments).model_dump()
         elif tool_name == "set-grid-margins":
-            payload = GridMarginsInput.model_validate(arguments)
-            result_data = get_revit_response("set_margins", payload.model_dump())
+            operation = "set_margins"
+            data = GridMarginsInput.model_validate(arguments).model_dump()
         elif tool_name == "remove-all-grids":
-            payload = RemoveAllGridsInput.model_validate(arguments)
-            result_data = get_revit_response("remove_all", payload.model_dump())
+            operation = "remove_all"
+            data = RemoveAllGridsInput.model_validate(arguments).model_dump()
         else:
             return types.ServerResult(
                 types.CallToolResult(
@@ -480,6 +641,8 @@ async def _call_tool_request(req: types.CallToolRequest) -> types.ServerResult:
             )
         )
 
+    result_data = get_revit_response(operation, data, local)
+
     # Check for errors
     if not result_data.get("ok", True) or result_data.get("status") == "error":
         return types.ServerResult(
@@ -494,16 +657,18 @@ async def _call_tool_request(req: types.CallToolRequest) -> types.ServerResult:
             )
         )
 
-    # Generate response with widget
-    widget_resource = _embedded_widget_resource(WIDGET)
-    meta: Dict[str, Any] = {
-        "openai.com/widget": widget_resource.model_dump(mode="json"),
-        "openai/outputTemplate": WIDGET.template_uri,
-        "openai/toolInvocation/invoking": WIDGET.invoking,
-        "openai/toolInvocation/invoked": WIDGET.invoked,
-        "openai/widgetAccessible": True,
-        "openai/resultCanProduceWidget": True,
-    }
+    # Keep the intersection index in step with committed changes; dry runs
+    # don't touch it, so they don't pay for the NumPy import either
+    if not data.get("dry_run") and result_data.get("status") != "preview":
+        _grid_index().update(operation, data, result_data)
+
+    # Static SVG preview replaces the widget when requested and there is a layout to draw
+    svg_resource = _embedded_svg_preview(result_data, data) if local.get("output") == "svg" else None
+
+    # Generate response with widget (structured data only if the assets are missing)
+    meta: Optional[Dict[str, Any]] = None
+    if svg_resource is None and WIDGET.html is not None:
+        meta = _widget_result_meta()
 
     # Build message
     status = result_data.get('status', 'ok')
@@ -517,9 +682,54 @@ async def _call_tool_request(req: types.CallToolRequest) -> types.ServerResult:
         message += f" ({count_x} X-grids, {count_y} Y-grids)"
 
     # Add Revit server info to message
-    if not USE_MOCK:
+    if not USE_MOCK and not REPLAY.active:
         message += f"\n\n✓ Connected to Revit at {REVIT_SERVER_URL}"
 
+    content: List[Any] = [
+        types.TextContent(
+            type="text",
+            text=message,
+        )
+    ]
+    if svg_resource is not None:
+        content.append(svg_resource)
+
+    return types.ServerResult(
+        types.CallToolResult(
+            content=content,
+            structuredContent=result_data,
+            _meta=meta,
+        )
+    )
+
+
+def _grid_index_result(query: GridIndexQueryInput) -> types.ServerResult:
+    """Answer a grid index query (no Revit call, no widget)."""
+    result_data = _grid_index().query(query.query, query.model_dump())
+
+    if not result_data.get("ok", True):
+        return types.ServerResult(
+            types.CallToolResult(
+                content=[
+                    types.TextContent(
+                        type="text",
+                        text=result_data.get("message", "Unknown error occurred"),
+                    )
+                ],
+                isError=True,
+            )
+        )
+
+    if query.query == "nearest":
+        point = result_data["intersection"]
+        message = f"Nearest intersection: {point['x_grid']} / {point['y_grid']} at ({point['x']}, {point['y']})"
+    elif query.query == "bays":
+        message = f"{result_data['count']} bays inside the rectangle"
+        if result_data["truncated"]:
+            message += f" (first {result_data['returned']} returned)"
+    else:
+        message = f"{result_data['x']['count']} X-grids, {result_data['y']['count']} Y-grids, {result_data['bays']} bays"
+
     return types.ServerResult(
         types.CallToolResult(
             content=[
@@ -529,11 +739,24 @@ async def _call_tool_request(req: types.CallToolRequest) -> types.ServerResult:
                 )
             ],
             structuredContent=result_data,
-            _meta=meta,
         )
     )
 
 
+def warm_up() -> None:
+    """
+    Load everything that is otherwise deferred to the first request.
+
+    Called by the production launcher before forking workers; call it from any
+    other host that wants to pay the cost at startup instead.
+    """
+    if WIDGET.html is not None:
+        _widget_result_meta()
+    _tool_catalog()
+    _grid_index()
+    get_revit_client(REVIT_SERVER_URL).warm_up()
+
+
 # Register custom handlers
 mcp._mcp_server.request_handlers[types.CallToolRequest] = _call_tool_request
 mcp._mcp_server.request_handlers[types.ReadResourceRequest] = _handle_read_resource
@@ -541,6 +764,10 @@ mcp._mcp_server.request_handlers[types.ReadResourceRequest] = _handle_read_resou
 # Create HTTP app
 app = mcp.streamable_http_app()
 
+# Admin-only profiling routes (disabled unless REVIT_MCP_ADMIN_TOKEN is set)
+app.router.routes.extend(admin_routes())
+arm_from_env()
+
 # Add CORS middleware
 try:
     from starlette.middleware.cors import CORSMiddleware
@@ -0,0 +1,65 @@
+"""Minimal MCP streamable-HTTP client used by the benchmark and replay tools.
+
+The server runs with ``stateless_http=True``, so each JSON-RPC request can be
+posted on its own without an ``initialize`` handshake.
+"""
+
+from __future__ import annotations
+
+import itertools
+import json
+import time
+from typing import Any, Dict, Optional, Tuple
+
+import requests
+
+DEFAULT_URL = "http://127.0.0.1:8000/mcp"
+
+_HEADERS = {
+    "Content-Type": "application/json",
+    "Accept": "application/json, text/event-stream",
+}
+_ids = itertools.count(1)
+
+
+def _parse_body(response: requests.Response) -> Dict[str, Any]:
+    """Decode a JSON or server-sent-events response into the JSON-RPC message."""
+    if response.headers.get("content-type", "").startswith("text/event-stream"):
+        for line in response.text.splitlines():
+            if line.startswith("data:"):
+                return json.loads(line[5:].strip())
+        return {}
+    return response.json()
+
+
+def rpc(
+    method: str,
+    params: Optional[Dict[str, Any]] = None,
+    url: str = DEFAULT_URL,
+    session: Optional[requests.Session] = None,
+    timeout: float = 60.0,
+) -> Tuple[Dict[str, Any], float]:
+    """
+    Send one JSON-RPC request to the MCP endpoint.
+
+    Returns:
+        Tuple of (JSON-RPC response message, elapsed milliseconds)
+    """
+    payload = {"jsonrpc": "2.0", "id": next(_ids), "method": method, "params": params or {}}
+    sender = session or requests
+    start = time.perf_counter()
+    response = sender.post(url, json=payload, headers=_HEADERS, timeout=timeout)
+    response.raise_for_status()
+    message = _parse_body(response)
+    return message, (time.perf_counter() - start) * 1000.0
+
+
+def call_tool(
+    name: str,
+    arguments: Dict[str, Any],
+    url: str = DEFAULT_URL,
+    session: Optional[requests.Session] = None,
+) -> Tuple[Dict[str, Any], float]:
+    """Call an MCP tool and return (result, elapsed milliseconds)."""
+    message, elapsed_ms = rpc("tools/call", {"name": name, "arguments": arguments}, url, session)
+    return message.get("result", message), elapsed_ms
@@ -0,0 +1,401 @@
+"""On-demand cProfile hooks for the Revit MCP server.
+
+The profiler is armed through admin-only HTTP routes, either for the next N
+tool calls, for a time window, or for every call slower than a latency
+threshold. Captured profiles are written to disk as ``.prof`` files (open them
+with ``snakeviz`` or ``python -m pstats``) and aggregated into a top-N summary
+of hot functions in ``main.py`` and ``revit_client.py``.
+
+All state lives in ``PROFILE_DIR`` so that it is shared by the launcher's
+worker processes: the arming is a small JSON file every worker re-reads at
+most once a second, the call budget is claimed with exclusively created
+files, and the summary is built from the ``.prof`` files of the current
+session, whichever worker wrote them.
+
+When nothing is armed, the cost on the tool-call path is a clock read on the
+``PROFILER`` singleton (plus a small file read once a second).
+"""
+
+from __future__ import annotations
+
+import hmac
+import json
+import logging
+import math
+import os
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+logger = logging.getLogger(__name__)
+
+PROFILE_DIR = Path(os.getenv("PROFILE_DIR", Path(__file__).resolve().parent / "profiles"))
+ADMIN_TOKEN = os.getenv("REVIT_MCP_ADMIN_TOKEN", "")
+
+# Files whose functions are reported in the summary (absolute, resolved paths)
+_SERVER_DIR = Path(__file__).resolve().parent
+SUMMARY_FILES = frozenset(str(_SERVER_DIR / name) for name in ("main.py", "revit_client.py"))
+
+_UNSAFE_LABEL = re.compile(r"[^\w-]+")
+
+STATE_FILE = "armed.json"
+REFRESH_INTERVAL = 1.0  # seconds between re-reads of the shared arming state
+
+
+class ToolCallProfiler:
+    """Profile MCP tool calls for a call budget, a time window or a latency threshold."""
+
+    def __init__(self, output_dir: Path = PROFILE_DIR):
+        self.output_dir = Path(output_dir)
+        self._lock = threading.Lock()
+        self._busy = False
+        self._count = 0
+        self._state: Optional[Dict[str, Any]] = None
+        self._next_refresh = 0.0
+        self._next_slot = ("", 0)  # (session, first call slot not known to be taken)
+
+    @property
+    def active(self) -> bool:
+        """Whether the shared arming state asks for profiling (re-read at most once a second)."""
+        now = time.monotonic()
+        if now >= self._next_refresh:
+            self._next_refresh = now + REFRESH_INTERVAL
+            self._state = self._read_state()
+        return self._is_live(self._state)
+
+    # Shared state -----------------------------------------------------------
+
+    @property
+    def _state_path(self) -> Path:
+        return self.output_dir / STATE_FILE
+
+    def _read_state(self) -> Optional[Dict[str, Any]]:
+        try:
+            state = json.loads(self._state_path.read_text(encoding="utf8"))
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as exc:
+            logger.warning("Could not read profiler state %s: %s", self._state_path, exc)
+            return None
+        return state if isinstance(state, dict) else None
+
+    def _write_state(self, state: Dict[str, Any]) -> None:
+        # Write and rename so that other workers never read a partial file
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        tmp = self._state_path.with_name(f"{STATE_FILE}.{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(state), encoding="utf8")
+        os.replace(tmp, self._state_path)
+        self._state = state
+
+    @staticmethod
+    def _is_live(state: Optional[Dict[str, Any]]) -> bool:
+        if not state or not state.get("active"):
+            return False
+        deadline = state.get("deadline")
+        return deadline is None or time.time() < deadline
+
+    def _session_dir(self, state: Optional[Dict[str, Any]]) -> Optional[Path]:
+        session = (state or {}).get("session")
+        return self.output_dir / session if session else None
+
+    def _claimed(self, state: Optional[Dict[str, Any]]) -> int:
+        session_dir = self._session_dir(state)
+        claims = session_dir / "claims" if session_dir else None
+        return sum(1 for _ in claims.iterdir()) if claims and claims.is_dir() else 0
+
+    def _claim_slot(self, state: Dict[str, Any]) -> bool:
+        """Take one slot of the call budget; each slot is a file only one process can create."""
+        claims = self._session_dir(state) / "claims"
+        claims.mkdir(parents=True, exist_ok=True)
+        session, first = self._next_slot
+        if session != state["session"]:
+            first = 0
+        for slot in range(first, state["calls"]):
+            try:
+                os.close(os.open(claims / str(slot), os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+            except FileExistsError:
+                continue
+            self._next_slot = (state["session"], slot + 1)
+            if slot == state["calls"] - 1:
+                # Budget used up: stop every worker, not just this one
+                self._write_state({**state, "active": False})
+            return True
+        self._next_slot = (state["session"], state["calls"])
+        return False
+
+    # Arming -----------------------------------------------------------------
+
+    def arm(
+        self,
+        calls: Optional[int] = None,
+        seconds: Optional[float] = None,
+        slow_ms: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        """
+        Start a new profiling session in every worker.
+
+        Args:
+            calls: Profile the next N tool calls
+            seconds: Profile every tool call for this many seconds
+            slow_ms: Only keep profiles of calls slower than this threshold (ms).
+                On its own it stays armed until ``disarm()`` is called.
+
+        Returns:
+            Current profiler status
+        """
+        if calls is None and seconds is None and slow_ms is None:
+            raise ValueError("Specify at least one of 'calls', 'seconds' or 'slow_ms'")
+        if calls is not None and calls <= 0:
+            raise ValueError("'calls' must be a positive integer")
+        if seconds is not None and not (math.isfinite(seconds) and seconds > 0):
+            raise ValueError("'seconds' must be a positive number")
+        if slow_ms is not None and not (math.isfinite(slow_ms) and slow_ms >= 0):
+            raise ValueError("'slow_ms' must be a non-negative number")
+
+        session = f"{time.strftime('%Y%m%d-%H%M%S')}-{os.urandom(3).hex()}"
+        with self._lock:
+            self._write_state({
+                "active": True,
+                "session": session,
+                "calls": calls,
+                # Wall clock, so that every worker agrees on it
+                "deadline": time.time() + seconds if seconds is not None else None,
+                "slow_ms": slow_ms,
+            })
+        return self.status()
+
+    def disarm(self) -> Dict[str, Any]:
+        """Stop profiling in every worker. Captured profiles and the summary are kept."""
+        with self._lock:
+            state = self._read_state()
+            if state and state.get("active"):
+                self._write_state({**state, "active": False})
+        return self.status()
+
+    def status(self) -> Dict[str, Any]:
+        """Return the shared arming state and the profile files of the current session."""
+        state = self._read_state()
+        calls = (state or {}).get("calls")
+        deadline = (state or {}).get("deadline")
+        remaining_calls = max(0, calls - self._claimed(state)) if calls is not None else None
+        return {
+            "active": self._is_live(state) and remaining_calls != 0,
+            "remaining_calls": remaining_calls,
+            "remaining_seconds": max(0.0, round(deadline - time.time(), 3)) if deadline is not None else None,
+            "slow_ms": (state or {}).get("slow_ms"),
+            "output_dir": str(self.output_dir),
+            "profiles": [str(path) for path in self._profile_files(state)],
+        }
+
+    # Capture ----------------------------------------------------------------
+
+    def _claim(self) -> Optional[Dict[str, Any]]:
+        """Reserve the profiler for one call; the arming state, or None if it should not profile."""
+        with self._lock:
+            if self._busy:
+                return None
+            # Read fresh: another worker may have used up the budget or disarmed
+            state = self._read_state()
+            self._state = state
+            if not self._is_live(state):
+                return None
+            try:
+                if state.get("calls") is not None and not self._claim_slot(state):
+                    return None
+            except OSError as exc:
+                logger.error("Could not claim a profiling slot in %s: %s", self.output_dir, exc)
+                return None
+            self._busy = True
+            return state
+
+    async def profile_call(self, label: str, func: Callable[..., Awaitable[T]], *args: Any) -> T:
+        """
+        Await ``func(*args)`` under cProfile if the profiler is armed.
+
+        Only one call per process is profiled at a time; concurrent calls run unprofiled.
+        """
+        state = self._claim()
+        if state is None:
+            return await func(*args)
+
+        import cProfile
+
+        profile = cProfile.Profile()
+        start = time.perf_counter()
+        profile.enable()
+        try:
+            return await func(*args)
+        finally:
+            profile.disable()
+            elapsed_ms = (time.perf_counter() - start) * 1000.0
+            try:
+                self._store(profile, state, label, elapsed_ms)
+            except Exception:
+                # Profiling must never change the outcome of the call
+                logger.exception("Failed to store profile for %r", label)
+            finally:
+                with self._lock:
+                    self._busy = False
+
+    def _store(self, profile: Any, state: Dict[str, Any], label: str, elapsed_ms: float) -> None:
+        """Write a captured profile to the session directory."""
+        slow_ms = state.get("slow_ms")
+        if slow_ms is not None and elapsed_ms < slow_ms:
+            return
+
+        # The label is the client-supplied tool name; keep it filename-safe
+        safe_label = _UNSAFE_LABEL.sub("_", label)[:64] or "unknown"
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        with self._lock:
+            self._count += 1
+            count = self._count
+        filename = f"{stamp}-{safe_label}-{int(elapsed_ms)}ms-{os.getpid()}-{count}.prof"
+        path = self._session_dir(state) / filename
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            profile.dump_stats(str(path))
+        except OSError as exc:
+            logger.error("Could not write profile to %s: %s", path, exc)
+
+    # Reporting --------------------------------------------------------------
+
+    def _profile_files(self, state: Optional[Dict[str, Any]]) -> List[Path]:
+        session_dir = self._session_dir(state)
+        if session_dir is None or not session_dir.is_dir():
+            return []
+        return sorted(session_dir.glob("*.prof"))
+
+    def summary(self, top: int = 20) -> List[Dict[str, Any]]:
+        """
+        Top-N hot functions in ``main.py`` and ``revit_client.py``.
+
+        Aggregated from the ``.prof`` files of the current session on disk, so
+        every worker reports the same summary.
+
+        Returns:
+            Rows sorted by cumulative time, with call counts and times in ms
+        """
+        import pstats
+
+        stats: Any = None
+        for path in self._profile_files(self._read_state()):
+            try:
+                if stats is None:
+                    stats = pstats.Stats(str(path))
+                else:
+                    stats.add(str(path))
+            except (OSError, EOFError, ValueError, TypeError) as exc:
+                # E.g. a profile another worker is still writing
+                logger.warning("Skipping unreadable profile %s: %s", path, exc)
+        if stats is None:
+            return []
+
+        rows = []
+        resolved: Dict[str, bool] = {}
+        for (filename, lineno, funcname), (_, ncalls, tottime, cumtime, _) in stats.stats.items():
+            # Compare full paths: pydantic/main.py must not count as our main.py
+            if filename not in resolved:
+                try:
+                    resolved[filename] = str(Path(filename).resolve()) in SUMMARY_FILES
+                except (OSError, ValueError):
+                    resolved[filename] = False
+            if not resolved[filename]:
+                continue
+            rows.append({
+                "function": f"{Path(filename).name}:{lineno}({funcname})",
+                "calls": ncalls,
+                "tottime_ms": round(tottime * 1000.0, 3),
+                "cumtime_ms": round(cumtime * 1000.0, 3),
+            })
+        rows.sort(key=lambda row: row["cumtime_ms"], reverse=True)
+        return rows[:top]
+
+
+PROFILER = ToolCallProfiler()
+
+
+# Admin routes ---------------------------------------------------------------
+
+def _is_admin(request: Any) -> bool:
+    """Check the admin token header. Admin routes are disabled without a token."""
+    if not ADMIN_TOKEN:
+        return False
+    supplied = request.headers.get("x-admin-token", "")
+    return hmac.compare_digest(supplied.encode("utf8"), ADMIN_TOKEN.encode("utf8"))
+
+
+async def _profiling_endpoint(request: Any) -> Any:
+    """GET: status and summary, POST: arm, DELETE: disarm."""
+    from starlette.responses import JSONResponse
+
+    if not _is_admin(request):
+        return JSONResponse({"ok": False, "status": "error", "message": "Forbidden"}, status_code=403)
+
+    if request.method == "DELETE":
+        try:
+            return JSONResponse({"ok": True, **PROFILER.disarm()})
+        except OSError as exc:
+            return JSONResponse(
+                {"ok": False, "status": "error", "message": f"Could not write profiler state: {exc}"}, status_code=500
+            )
+
+    if request.method == "POST":
+        try:
+            body = await request.json()
+        except ValueError:
+            body = {}
+        if not isinstance(body, dict):
+            return JSONResponse(
+                {"ok": False, "status": "error", "message": "Body must be a JSON object"}, status_code=400
+            )
+        try:
+            state = PROFILER.arm(
+                calls=int(body["calls"]) if body.get("calls") is not None else None,
+                seconds=float(body["seconds"]) if body.get("seconds") is not None else None,
+                slow_ms=float(body["slow_ms"]) if body.get("slow_ms") is not None else None,
+            )
+        except (TypeError, ValueError, OverflowError) as exc:
+            return JSONResponse({"ok": False, "status": "error", "message": str(exc)}, status_code=400)
+        except OSError as exc:
+            return JSONResponse(
+                {"ok": False, "status": "error", "message": f"Could not write profiler state: {exc}"}, status_code=500
+            )
+        return JSONResponse({"ok": True, **state})
+
+    try:
+        top = int(request.query_params.get("top", 20))
+    except ValueError:
+        top = 20
+    return JSONResponse({"ok": True, **PROFILER.status(), "summary": PROFILER.summary(top)})
+
+
+def admin_routes() -> List[Any]:
+    """Starlette routes for the profiling admin API."""
+    from starlette.routing import Route
+
+    return [Route("/admin/profiling", _profiling_endpoint, methods=["GET", "POST", "DELETE"])]
+
+
+def arm_from_env() -> None:
+    """Arm slow-call profiling at startup when ``PROFILE_SLOW_MS`` is set."""
+    slow_ms = os.getenv("PROFILE_SLOW_MS")
+    if not slow_ms:
+        return
+    try:
+        threshold = float(slow_ms)
+        # Spawned workers each import the app; keep the session the first one started
+        current = PROFILER._read_state()
+        if (
+            PROFILER._is_live(current)
+            and current.get("slow_ms") == threshold
+            and current.get("calls") is None
+            and current.get("deadline") is None
+        ):
+            return
+        PROFILER.arm(slow_ms=threshold)
+    except (OSError, ValueError) as exc:
+        logger.error("Could not arm profiling from PROFILE_SLOW_MS=%r: %s", slow_ms, exc)
@@ -0,0 +1,165 @@
+"""Replay client: play a traffic capture against a running server.
+
+Reads a capture written by ``traffic.TrafficRecorder``, sends its tool calls
+at recorded or scaled speed and reports per-tool latency, with deltas against
+a baseline report. Run it with ``python -m revit_mcp_server replay``; pair it
+with a server started with ``REVIT_MCP_REPLAY`` so no Revit is needed.
+"""
+
+from __future__ import annotations
+
+import json
+import statistics
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from traffic import load_capture
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100.0 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def summarize(latencies: Dict[str, List[float]]) -> Dict[str, Dict[str, float]]:
+    """Per-tool and overall latency statistics in milliseconds."""
+    summary: Dict[str, Dict[str, float]] = {}
+    everything: List[float] = []
+    for tool, values in sorted(latencies.items()):
+        everything.extend(values)
+        summary[tool] = {
+            "count": len(values),
+            "mean_ms": round(statistics.fmean(values), 3),
+            "p50_ms": round(_percentile(values, 50), 3),
+            "p95_ms": round(_percentile(values, 95), 3),
+        }
+    if everything:
+        summary["*"] = {
+            "count": len(everything),
+            "mean_ms": round(statistics.fmean(everything), 3),
+            "p50_ms": round(_percentile(everything, 50), 3),
+            "p95_ms": round(_percentile(everything, 95), 3),
+        }
+    return summary
+
+
+def compare(summary: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]]) -> Dict[str, Dict[str, float]]:
+    """Latency deltas (current - baseline) per tool, in ms and percent of p50."""
+    deltas: Dict[str, Dict[str, float]] = {}
+    for tool, stats in summary.items():
+        base = baseline.get(tool)
+        if not base:
+            continue
+        deltas[tool] = {
+            "p50_delta_ms": round(stats["p50_ms"] - base["p50_ms"], 3),
+            "p95_delta_ms": round(stats["p95_ms"] - base["p95_ms"], 3),
+            "p50_delta_pct": round((stats["p50_ms"] / base["p50_ms"] - 1.0) * 100.0, 1) if base["p50_ms"] else 0.0,
+        }
+    return deltas
+
+
+def replay(
+    capture: Path,
+    url: str,
+    speed: float = 1.0,
+    concurrency: int = 8,
+    baseline: Optional[Path] = None,
+) -> Dict[str, Any]:
+    """
+    Play a capture against a running server.
+
+    Args:
+        capture: Capture JSONL file
+        url: MCP endpoint, e.g. http://127.0.0.1:8000/mcp
+        speed: Playback speed relative to the recording (2.0 = twice as fast).
+            0 sends calls back to back, ignoring recorded timing.
+        concurrency: Max calls in flight
+        baseline: Report from an earlier replay to compare against
+
+    Returns:
+        Report with per-tool latency summary and, with a baseline, deltas
+    """
+    import requests
+
+    from mcp_http import call_tool
+
+    entries = load_capture(capture)
+    latencies: Dict[str, List[float]] = defaultdict(list)
+    errors = 0
+    lock = threading.Lock()
+    local = threading.local()
+
+    def send(entry: Dict[str, Any]) -> None:
+        nonlocal errors
+        if not hasattr(local, "session"):
+            local.session = requests.Session()
+        try:
+            result, elapsed_ms = call_tool(entry["tool"], entry["arguments"], url=url, session=local.session)
+            failed = bool(result.get("isError"))
+        except Exception:
+            elapsed_ms, failed = 0.0, True
+        with lock:
+            if failed:
+                errors += 1
+            else:
+                latencies[entry["tool"]].append(elapsed_ms)
+
+    start = time.monotonic()
+    first_t = entries[0]["t"] if entries else 0.0
+    with ThreadPoolExecutor(concurrency) as pool:
+        for entry in entries:
+            if speed > 0:
+                delay = (entry["t"] - first_t) / speed - (time.monotonic() - start)
+                if delay > 0:
+                    time.sleep(delay)
+            pool.submit(send, entry)
+
+    report: Dict[str, Any] = {
+        "capture": str(capture),
+        "speed": speed,
+        "calls": len(entries),
+        "errors": errors,
+        "wall_s": round(time.monotonic() - start, 3),
+        "summary": summarize(latencies),
+    }
+    if baseline is not None:
+        with open(baseline, encoding="utf8") as f:
+            report["deltas"] = compare(report["summary"], json.load(f)["summary"])
+    return report
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    """Human-readable replay report."""
+    print(f"Replayed {report['calls']} calls in {report['wall_s']}s ({report['errors']} errors)")
+    deltas = report.get("deltas", {})
+    for tool, stats in report["summary"].items():
+        line = f"  {tool:<20} n={stats['count']:<5} p50={stats['p50_ms']:>8.2f} ms  p95={stats['p95_ms']:>8.2f} ms"
+        if tool in deltas:
+            d = deltas[tool]
+            line += f"  Δp50={d['p50_delta_ms']:+.2f} ms ({d['p50_delta_pct']:+.1f}%)  Δp95={d['p95_delta_ms']:+.2f} ms"
+        print(line)
+
+
+def add_arguments(parser: Any) -> None:
+    """Register ``replay`` options on an argparse parser."""
+    from mcp_http import DEFAULT_URL
+
+    parser.add_argument("capture", type=Path, help="Capture JSONL file")
+    parser.add_argument("--url", default=DEFAULT_URL, help="MCP endpoint of the server under test")
+    parser.add_argument("--speed", type=float, default=1.0, help="Playback speed (0 = as fast as possible)")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--baseline", type=Path, help="Earlier replay report to compare against")
+    parser.add_argument("--out", type=Path, help="Write the report as JSON (use it as a later baseline)")
+
+
+def run(args: Any) -> None:
+    """CLI handler for ``python -m revit_mcp_server replay``."""
+    report = replay(args.capture, args.url, args.speed, args.concurrency, args.baseline)
+    print_report(report)
+    if args.out:
+        args.out.write_text(json.dumps(report, indent=2), encoding="utf8")
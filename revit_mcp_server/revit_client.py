@@ -1,8 +1,10 @@
-"""Revit API Client for communicating with pyRevit HTTP server."""
+"""Revit API Client for communicating with pyRevit HTTP server.
+
+``requests`` is imported on first use so that importing this module (and
+``main``) stays cheap on cold start.
+"""
 
-import requests
 from typing import Dict, Any, Optional
-from requests.exceptions import RequestException, Timeout, ConnectionError
 
 
 class RevitAPIClient:
@@ -20,6 +22,10 @@ class RevitAPIClient:
         self.api_prefix = api_prefix
         self.timeout = 30  # seconds
 
+    def warm_up(self) -> None:
+        """Import the HTTP stack ahead of the first call."""
+        import requests  # noqa: F401
+
     def _build_url(self, endpoint: str) -> str:
         """Build the full URL for an API endpoint."""
         endpoint = endpoint.lstrip("/")
@@ -27,6 +33,8 @@ class RevitAPIClient:
 
     def health_check(self) -> Dict[str, Any]:
         """Check if the pyRevit server is healthy and has an active document."""
+        import requests
+
         try:
             url = self._build_url("/__health")
             response = requests.get(url, timeout=5)
@@ -41,6 +49,8 @@ class RevitAPIClient:
 
     def list_operations(self) -> Dict[str, Any]:
         """List all available operations from the pyRevit server."""
+        import requests
+
         try:
             url = self._build_url("/__ops")
             response = requests.get(url, timeout=self.timeout)
@@ -64,6 +74,9 @@ class RevitAPIClient:
         Returns:
             Response data from pyRevit server
         """
+        import requests
+        from requests.exceptions import RequestException, Timeout, ConnectionError
+
         url = self._build_url(endpoint)
 
         try:
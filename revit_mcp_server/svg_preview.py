@@ -0,0 +1,210 @@
+"""Server-side SVG preview of grid layouts.
+
+A lightweight alternative to the React revit-grid widget for simple previews
+and for clients that can't run widgets. Renders axes, grid bubbles, the range
+box and spacing dimensions. Output size stays bounded for layouts with
+thousands of grids: all axes share one relative ``<path>``, axes and labels
+are thinned to fixed budgets and runs of equal spacing become a single
+``n × s`` dimension.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import math
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+from xml.sax.saxutils import escape
+
+from grid_results import Grid, parse_grids, parse_number
+
+MIME_TYPE = "image/svg+xml"
+
+WIDTH = 800  # px, height follows the layout's aspect ratio
+PAD = 48  # px around the range box for bubbles and dimensions
+MAX_AXES = 400  # per axis; denser layouts are thinned (closer than 2 px apart)
+MAX_LABELS = 40  # per axis
+MAX_DIMENSIONS = 40  # per axis
+CACHE_SIZE = 128
+
+_cache: "OrderedDict[str, str]" = OrderedDict()
+
+
+def _grids(result: Dict[str, Any], axis: str) -> List[Grid]:
+    """(name, coordinate) pairs along ``axis`` from any grid tool result, sorted."""
+    return sorted(parse_grids(result, axis), key=lambda grid: grid[1])
+
+
+def _extent(
+    result: Dict[str, Any], extents: Dict[str, Any], xs: List[Grid], ys: List[Grid]
+) -> Tuple[float, float, float, float]:
+    """Range box from the result, else the requested extents, else the grids plus a margin."""
+    rng = result.get("range") if isinstance(result.get("range"), dict) else {}
+    margin = 3000.0
+
+    def bounds(lo_key: str, hi_key: str, grids: List[Grid]) -> Tuple[float, float]:
+        for source in (rng, extents):
+            lo, hi = parse_number(source.get(lo_key)), parse_number(source.get(hi_key))
+            if lo is not None and hi is not None and hi > lo:
+                return lo, hi
+        if grids:
+            return grids[0][1] - margin, grids[-1][1] + margin
+        return -margin, margin
+
+    x_min, x_max = bounds("x_min", "x_max", xs)
+    y_min, y_max = bounds("y_min", "y_max", ys)
+    return x_min, x_max, y_min, y_max
+
+
+def _axis_path(positions: List[float], fixed: float, length: float, vertical: bool) -> str:
+    """One relative path for a family of parallel lines (``M x y v L m dx -L v L ...``)."""
+    if not positions:
+        return ""
+    step = max(1, math.ceil(len(positions) / MAX_AXES))
+    # Round absolute positions first so relative moves don't accumulate error
+    positions = [round(pos, 1) for pos in positions[::step]]
+    size = _fmt(length)
+    if vertical:
+        out = [f"M{_fmt(positions[0])} {_fmt(fixed)}v{size}"]
+        out += [f"m{_fmt(pos - prev)} -{size}v{size}" for prev, pos in zip(positions, positions[1:])]
+    else:
+        out = [f"M{_fmt(fixed)} {_fmt(positions[0])}h{size}"]
+        out += [f"m-{size} {_fmt(pos - prev)}h{size}" for prev, pos in zip(positions, positions[1:])]
+    return "".join(out)
+
+
+def _runs(coords: List[float]) -> List[Tuple[int, int, Optional[float]]]:
+    """Group consecutive equal spacings: (start index, end index, spacing)."""
+    runs: List[Tuple[int, int, Optional[float]]] = []
+    for i in range(len(coords) - 1):
+        spacing = round(coords[i + 1] - coords[i], 3)
+        if runs and runs[-1][2] == spacing and runs[-1][1] == i:
+            runs[-1] = (runs[-1][0], i + 1, spacing)
+        else:
+            runs.append((i, i + 1, spacing))
+    return runs
+
+
+def _fmt(value: float) -> str:
+    """Compact number formatting for SVG attributes."""
+    return f"{value:.1f}".rstrip("0").rstrip(".")
+
+
+def _dim_text(count: int, spacing: float) -> str:
+    spacing_text = _fmt(spacing)
+    return f"{count}×{spacing_text}" if count > 1 else spacing_text
+
+
+def render(result: Dict[str, Any], extents: Optional[Dict[str, Any]] = None) -> Optional[str]:
+    """
+    Render a grid tool result as SVG; None if it contains no grids.
+
+    ``extents`` are the requested ``x_min``/``x_max``/``y_min``/``y_max``, used
+    for the range box when the result has no ``range`` (single-axis tools).
+    """
+    xs = _grids(result, "x")
+    ys = _grids(result, "y")
+    if not xs and not ys:
+        return None
+
+    x_min, x_max, y_min, y_max = _extent(result, extents or {}, xs, ys)
+    span_x = max(x_max - x_min, 1.0)
+    span_y = max(y_max - y_min, 1.0)
+    scale = (WIDTH - 2 * PAD) / span_x
+    height = min(max(span_y * scale + 2 * PAD, 2 * PAD + 40), 4 * WIDTH)
+    scale = min(scale, (height - 2 * PAD) / span_y)
+
+    def px(x: float) -> float:
+        return PAD + (x - x_min) * scale
+
+    def py(y: float) -> float:
+        # Revit Y points up, SVG Y points down
+        return height - PAD - (y - y_min) * scale
+
+    left, right, top, bottom = px(x_min), px(x_max), py(y_max), py(y_min)
+
+    axis_path = _axis_path([px(x) for _, x in xs], top, bottom - top, vertical=True)
+    axis_path += _axis_path([py(y) for _, y in ys], left, right - left, vertical=False)
+
+    parts = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {WIDTH} {_fmt(height)}" '
+        f'font-family="sans-serif" font-size="10">',
+        f'<rect x="{_fmt(left)}" y="{_fmt(top)}" width="{_fmt(right - left)}" '
+        f'height="{_fmt(bottom - top)}" fill="none" stroke="#bbb" stroke-dasharray="4 3"/>',
+        f'<path d="{axis_path}" stroke="#e03131" stroke-width="1" stroke-dasharray="12 3 2 3"/>',
+    ]
+
+    # Grid bubbles, thinned to the label budget
+    bubbles: List[Tuple[str, str, str]] = []
+    x_step = max(1, math.ceil(len(xs) / MAX_LABELS))
+    bubbles += [(_fmt(px(x)), _fmt(top - 14), name) for name, x in xs[::x_step]]
+    y_step = max(1, math.ceil(len(ys) / MAX_LABELS))
+    bubbles += [(_fmt(left - 14), _fmt(py(y)), name) for name, y in ys[::y_step]]
+    if bubbles:
+        circles = "".join(f'<circle cx="{cx}" cy="{cy}" r="10"/>' for cx, cy, _ in bubbles)
+        texts = "".join(f'<text x="{cx}" y="{cy}">{escape(name)}</text>' for cx, cy, name in bubbles)
+        parts.append(f'<g fill="#fff" stroke="#333">{circles}</g>')
+        parts.append(f'<g fill="#333" text-anchor="middle" dominant-baseline="central" font-size="8">{texts}</g>')
+
+    # Spacing dimensions: one per run of equal spacing, or overall if too many runs
+    dims: List[str] = []
+    dim_path: List[str] = []
+    x_coords = [x for _, x in xs]
+    x_runs = _runs(x_coords)
+    if len(x_runs) > MAX_DIMENSIONS:
+        x_runs = [(0, len(x_coords) - 1, None)] if len(x_coords) > 1 else []
+    dim_y = bottom + 20
+    for start, end, spacing in x_runs:
+        x0, x1 = px(x_coords[start]), px(x_coords[end])
+        dim_path.append(f"M{_fmt(x0)} {_fmt(dim_y)}H{_fmt(x1)}")
+        text = _dim_text(end - start, spacing) if spacing is not None else _fmt(x_coords[end] - x_coords[start])
+        dims.append(f'<text x="{_fmt((x0 + x1) / 2)}" y="{_fmt(dim_y - 3)}">{text}</text>')
+
+    y_coords = [y for _, y in ys]
+    y_runs = _runs(y_coords)
+    if len(y_runs) > MAX_DIMENSIONS:
+        y_runs = [(0, len(y_coords) - 1, None)] if len(y_coords) > 1 else []
+    dim_x = right + 20
+    for start, end, spacing in y_runs:
+        y0, y1 = py(y_coords[start]), py(y_coords[end])
+        dim_path.append(f"M{_fmt(dim_x)} {_fmt(y0)}V{_fmt(y1)}")
+        text = _dim_text(end - start, spacing) if spacing is not None else _fmt(y_coords[end] - y_coords[start])
+        mid = _fmt((y0 + y1) / 2)
+        dims.append(
+            f'<text x="{_fmt(dim_x + 3)}" y="{mid}" transform="rotate(90 {_fmt(dim_x + 3)} {mid})">{text}</text>'
+        )
+
+    if dim_path:
+        parts.append(f'<path d="{"".join(dim_path)}" stroke="#1971c2" stroke-width="0.75"/>')
+        parts.append(f'<g fill="#1971c2" text-anchor="middle">{"".join(dims)}</g>')
+
+    parts.append("</svg>")
+    return "".join(parts)
+
+
+def canonical_hash(result: Dict[str, Any]) -> str:
+    """Stable hash of a result payload, independent of key order."""
+    canonical = json.dumps(result, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode("utf8")).hexdigest()[:16]
+
+
+def render_cached(result: Dict[str, Any], extents: Optional[Dict[str, Any]] = None) -> Tuple[str, Optional[str]]:
+    """
+    Render with an LRU cache keyed by the canonical payload hash.
+
+    Returns:
+        Tuple of (payload hash, SVG markup or None if there is nothing to draw)
+    """
+    digest = canonical_hash({"result": result, "extents": extents or {}})
+    svg = _cache.get(digest)
+    if svg is not None:
+        _cache.move_to_end(digest)
+        return digest, svg
+
+    svg = render(result, extents)
+    if svg is not None:
+        _cache[digest] = svg
+        if len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+    return digest, svg
@@ -0,0 +1,160 @@
+"""Capture and replay of MCP tool traffic for performance regression testing.
+
+Capture (opt-in) appends one JSON line per Revit operation to the file named
+by ``REVIT_MCP_CAPTURE``:
+
+    {"t": 1.234, "tool": "create-xy-grids", "operation": "create_xy",
+     "arguments": {...}, "response": {...}, "revit_ms": 12.5}
+
+Free-text strings (labels, prefixes, grid names, messages) are replaced by an
+HMAC keyed with a random per-capture secret. Repeated values stay equal within
+a capture, which is all replay needs, but short or guessable values can't be
+recovered by hashing candidates.
+
+On the server, ``REVIT_MCP_REPLAY`` points at a capture and serves the
+recorded pyRevit responses instead of calling Revit. The replay client that
+plays a capture against a running server lives in ``replay.py``.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import hmac
+import json
+import logging
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from pathlib import Path
+from typing import Any, Deque, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Operation -> MCP tool name, as routed in main._dispatch_tool_call
+OPERATION_TOOLS = {
+    "create_y": "create-y-grids",
+    "create_x": "create-x-grids",
+    "create_xy": "create-xy-grids",
+    "set_heights": "set-grid-heights",
+    "set_margins": "set-grid-margins",
+    "remove_all": "remove-all-grids",
+}
+
+# String fields that are enums, not user text, and are kept as-is
+_PLAIN_KEYS = {
+    "mode", "x_mode", "y_mode",
+    "label_scheme", "x_label_scheme", "y_label_scheme",
+    "status", "output",
+}
+
+
+def anonymize(value: Any, secret: bytes, key: Optional[str] = None) -> Any:
+    """Replace free-text strings with keyed hashes; numbers and structure are kept."""
+    if isinstance(value, dict):
+        return {k: anonymize(v, secret, k) for k, v in value.items()}
+    if isinstance(value, list):
+        return [anonymize(v, secret, key) for v in value]
+    if isinstance(value, str) and key not in _PLAIN_KEYS:
+        return "anon-" + hmac.new(secret, value.encode("utf8"), hashlib.sha256).hexdigest()[:12]
+    return value
+
+
+def load_capture(path: Path) -> List[Dict[str, Any]]:
+    """Read a capture file, skipping blank lines."""
+    with open(path, encoding="utf8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+class TrafficRecorder:
+    """Append anonymized Revit operations and their timing to a JSONL file."""
+
+    def __init__(self, path: Optional[str]):
+        self.active = bool(path)
+        self._path = Path(path) if path else None
+        self._file = None
+        self._lock = threading.Lock()
+        self._start = time.monotonic()
+        # Random per capture; set REVIT_MCP_CAPTURE_KEY to share one key across
+        # processes that append to the same file (e.g. spawned workers)
+        key = os.getenv("REVIT_MCP_CAPTURE_KEY")
+        self._secret = key.encode("utf8") if key else os.urandom(32)
+
+    def record(
+        self,
+        operation: str,
+        data: Dict[str, Any],
+        response: Dict[str, Any],
+        started_at: float,
+        revit_ms: float,
+    ) -> None:
+        """
+        Write one captured operation.
+
+        ``started_at`` is the ``time.monotonic()`` reading taken before the Revit
+        call, so that replay schedules calls at their original start times.
+
+        Capture is a diagnostic: if the entry can't be written, the error is
+        logged once and capture is turned off instead of failing the call.
+        """
+        try:
+            entry = {
+                "t": round(started_at - self._start, 4),
+                "tool": OPERATION_TOOLS.get(operation, operation),
+                "operation": operation,
+                "arguments": anonymize(data, self._secret),
+                "response": anonymize(response, self._secret),
+                "revit_ms": round(revit_ms, 3),
+            }
+            line = json.dumps(entry, separators=(",", ":")) + "\n"
+            with self._lock:
+                if not self.active:
+                    return
+                if self._file is None:
+                    self._path.parent.mkdir(parents=True, exist_ok=True)
+                    self._file = open(self._path, "a", encoding="utf8")
+                self._file.write(line)
+                self._file.flush()
+        except (OSError, TypeError, ValueError) as exc:
+            with self._lock:
+                if not self.active:
+                    return
+                self.active = False
+            logger.error("Traffic capture to %s failed, capture disabled: %s", self._path, exc)
+
+
+class ReplayBackend:
+    """Serve recorded pyRevit responses in capture order, per operation."""
+
+    def __init__(self, path: Optional[str], simulate_latency: bool = False):
+        self.active = bool(path)
+        self.simulate_latency = simulate_latency
+        self._queues: Dict[str, Deque[Dict[str, Any]]] = defaultdict(deque)
+        self._lock = threading.Lock()
+        if path:
+            for entry in load_capture(Path(path)):
+                self._queues[entry["operation"]].append(entry)
+
+    def response(self, operation: str, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Next recorded response for ``operation``; the queue cycles when exhausted."""
+        with self._lock:
+            queue = self._queues.get(operation)
+            if not queue:
+                return {
+                    "ok": False,
+                    "status": "error",
+                    "message": f"No recorded response for operation: {operation}",
+                }
+            entry = queue.popleft()
+            queue.append(entry)
+
+        if self.simulate_latency:
+            time.sleep(entry.get("revit_ms", 0.0) / 1000.0)
+        return json.loads(json.dumps(entry["response"]))
+
+
+RECORDER = TrafficRecorder(os.getenv("REVIT_MCP_CAPTURE"))
+REPLAY = ReplayBackend(
+    os.getenv("REVIT_MCP_REPLAY"),
+    simulate_latency=os.getenv("REVIT_MCP_REPLAY_LATENCY", "false").lower() == "true",
+)